@@ -0,0 +1,93 @@
+import chess
+import chess.engine
+import chess.pgn
+
+# This is the GameAnalysis Class.
+# It analyses a whole game after it has been transcribed, instead of evaluating every position on its own.
+# The moves are fed to one engine session in order, so Stockfish can reuse its hash table between neighbouring positions.
+
+class GameAnalysis:
+
+    def __init__(self, engine_path="stockfish", time_budget=60.0, scan_share=0.25, max_swing=300, hash_size=256, threads=1, mate_score=10000):
+
+        if not 0 <= scan_share <= 1:
+            raise ValueError(f"Error: scan_share must be between 0 and 1, not {scan_share}")
+
+        self.engine_path = engine_path
+        # The total number of seconds the engine can think for over the whole game.
+        # This keeps the cost of analysing a game bounded, no matter how long the game was.
+        self.time_budget = time_budget
+        # The first pass gives every position the same (small) amount of time. The rest of the budget is kept for positions where the eval swings.
+        self.scan_share = scan_share
+        # Swings are capped (in centipawns), so one blunder or mate can't take the whole budget from the other positions.
+        self.max_swing = max_swing
+        self.hash_size = hash_size
+        self.threads = threads
+        # Mates don't have a centipawn value, so they are treated as a very large advantage when measuring swings.
+        self.mate_score = mate_score
+
+    # Splits the remaining budget between positions, weighted by how much the eval swung going into each one.
+    # Every position gets a share of at least 1, so quiet positions are still looked at again.
+    def allocate_time(self, swings, budget):
+
+        weights = [1 + min(swing, self.max_swing) / 100 for swing in swings]
+        total_weight = sum(weights)
+        return [budget * weight / total_weight for weight in weights]
+
+    # Measures how much the eval changed from the previous position, in centipawns.
+    def find_swings(self, centipawns):
+
+        swings = []
+        previous = 0
+        for value in centipawns:
+            swings.append(abs(value - previous))
+            previous = value
+        return swings
+
+    # Converts the engine's score into the same format the Stockfish API returns, so it can go into move_to_eval_map.
+    def to_eval_dict(self, score):
+
+        white_score = score.white()
+        if white_score.is_mate():
+            return {"type": "mate", "value": white_score.mate()}
+        return {"type": "cp", "value": white_score.score()}
+
+    # Runs one pass over the game, playing the moves on a single board so the engine sees them in sequence.
+    def run_pass(self, engine, game, time_limits):
+
+        board = game.board()
+        infos = []
+        for move, time_limit in zip(game.mainline_moves(), time_limits):
+            board.push(move)
+            # Passing the game object means the engine is only told about a new game once, so the hash table stays warm.
+            infos.append(engine.analyse(board, chess.engine.Limit(time=time_limit), game=game))
+        return infos
+
+    # Analyses a chess.pgn.Game, writes the evals into it as comments, and returns a move_num to eval map.
+    def analyse_game(self, game):
+
+        moves = list(game.mainline_moves())
+        if not moves:
+            return {}
+
+        scan_budget = self.time_budget * self.scan_share
+        scan_limits = [scan_budget / len(moves)] * len(moves)
+
+        with chess.engine.SimpleEngine.popen_uci(self.engine_path) as engine:
+            engine.configure({"Hash": self.hash_size, "Threads": self.threads})
+
+            # First pass - a quick look at every position, which also fills up the hash table.
+            scan_infos = self.run_pass(engine, game, scan_limits)
+            centipawns = [info["score"].white().score(mate_score=self.mate_score) for info in scan_infos]
+
+            # Second pass - the rest of the budget, with more time where the eval swings.
+            deep_limits = self.allocate_time(self.find_swings(centipawns), self.time_budget - scan_budget)
+            deep_infos = self.run_pass(engine, game, deep_limits)
+
+        move_to_eval_map = {}
+        for move_num, (node, info) in enumerate(zip(game.mainline(), deep_infos), start=1):
+            # This is written as an [%eval] comment, which most PGN viewers can read.
+            node.set_eval(info["score"], info.get("depth"))
+            move_to_eval_map[move_num] = self.to_eval_dict(info["score"])
+
+        return move_to_eval_map
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+# This is the ClockEventLog Class.
+# It records when the chess clock was started and each time a player pressed it.
+# These timestamps are used to pull the right frames out of a video of the game, instead of taking a photo after every move.
+
+class ClockEventLog:
+
+    # "start" is when the clock was started. "white" and "black" are presses by that player, i.e. the end of their move.
+    valid_events = ("start", "white", "black")
+
+    def __init__(self, events=None):
+        # A list of (timestamp, event) tuples, with timestamps in seconds since the clock was started.
+        self.events = events or []
+
+    def record_event(self, event, timestamp):
+
+        if event not in self.valid_events:
+            raise ValueError(f"Error: Unknown clock event '{event}'")
+        if event == "start" and self.events:
+            raise ValueError("Error: The clock can only be started once")
+        if event != "start":
+            self.check_press(event, timestamp)
+        if self.events and timestamp < self.events[-1][0]:
+            raise ValueError(f"Error: Clock event at {timestamp}s is earlier than the previous event")
+        self.events.append((timestamp, event))
+
+    # Every press is turned into a frame (and so a move), so an extra press would look like a move that never happened.
+    # White moves first, and after that the presses have to alternate between the players.
+    def check_press(self, event, timestamp):
+
+        if not self.events:
+            raise ValueError(f"Error: Clock press at {timestamp}s is before the clock was started")
+        previous_event = self.events[-1][1]
+        if previous_event == "start" and event != "white":
+            raise ValueError(f"Error: The first clock press at {timestamp}s should be by white, not {event}")
+        if previous_event == event:
+            raise ValueError(f"Error: {event} pressed the clock twice in a row at {timestamp}s")
+
+    # Each line of the file is "<timestamp> <event>", e.g. "12.48 white".
+    def save(self, path):
+
+        with open(path, "w") as file:
+            for timestamp, event in self.events:
+                file.write(f"{timestamp:.3f} {event}\n")
+
+    def load(self, path):
+
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Error: Could not load clock events at {path}")
+
+        self.events = []
+        with open(path) as file:
+            for line_num, line in enumerate(file, start=1):
+                line = line.strip()
+                # Blank lines and comments are skipped, so recorded files can be annotated by hand.
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split()
+                try:
+                    timestamp = float(parts[0])
+                except ValueError:
+                    raise ValueError(f"Error: Could not read clock event on line {line_num} of {path}")
+                if len(parts) != 2:
+                    raise ValueError(f"Error: Could not read clock event on line {line_num} of {path}")
+                self.record_event(parts[1], timestamp)
+        return self
+
+    # The timestamps in the video where a frame should be taken: the start of the game, then every press.
+    # video_offset is how many seconds into the video the clock was started.
+    def frame_timestamps(self, video_offset=0.0):
+
+        if not self.events or self.events[0][1] != "start":
+            raise ValueError("Error: The clock events need to begin with a 'start' event")
+        # Without a press there is no move, only the starting position
+        if len(self.events) < 2:
+            raise ValueError("Error: The clock events need at least one press after the 'start' event")
+        return [timestamp + video_offset for timestamp, _ in self.events]
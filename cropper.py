@@ -3,11 +3,12 @@ import cv2
 class Cropper:
     
     # hard coded for now, consider changing.
-    def __init__(self, image_path="pics/IMG_0744.jpg"):
+    # An image can be passed in directly, e.g. the first frame of a video.
+    def __init__(self, image_path="pics/IMG_0744.jpg", image=None):
         self.image_path = image_path
         self.points = []
         self.final_points = []
-        self.image = cv2.imread(self.image_path)
+        self.image = image if image is not None else cv2.imread(self.image_path)
         
         if self.image is None:
             raise FileNotFoundError(f"Error: Could not load image at {self.image_path}")
@@ -1,8 +1,17 @@
 import chess
 import chess.pgn
-from stockfish import Stockfish
+try:
+    from stockfish import Stockfish
+except ImportError:
+    # Stockfish is only needed to evaluate each move as it is made. The post-game analysis doesn't use it.
+    Stockfish = None
 import image_processing_module
 import cropper
+import analysis_module
+import clock_module
+import video_module
+import game_record_module
+from collections import deque
 
 class Piece():
 
@@ -186,7 +195,8 @@ class Board():
 
 class Game():
 
-    def __init__(self, board = Board(), turn = 'white', move_num = 1, image_processing = image_processing_module.ImageProcessing()):
+    # If the whole game is analysed at the end (live_evals = False), there is no need to evaluate each move as it is made.
+    def __init__(self, board = Board(), turn = 'white', move_num = 1, image_processing = image_processing_module.ImageProcessing(), live_evals = True):
 
         self.board = board
         self.turn = turn
@@ -201,14 +211,22 @@ class Game():
         self.chess_module_board = chess.Board()
         self.chess_module_pgn = chess.pgn.Game()
         self.image_processing = image_processing
-        self.stockfish = Stockfish()
+        self.live_evals = live_evals
+        if (live_evals and Stockfish is None):
+            raise ImportError("Error: The stockfish package is needed to evaluate each move. Install it, or use analysis_time_budget instead.")
+        # Stockfish is only started if it is needed, so it doesn't sit idle next to the analysis engine
+        self.stockfish = Stockfish() if live_evals else None
         self.white_castled = False
         self.black_castled = False
-        image_processing.read_file_names()
+        # Frames from a video don't need the pics folder
+        if (image_processing.frame_source is None):
+            image_processing.read_file_names()
         self.underpromotions = False
         self.current_uci = ""
         # Deafult option is a queen
         self.pawn_promoted_to = "q"
+        # If a GameRecorder is set, every move is written to disk as soon as it is made.
+        self.recorder = None
 
     # After a turn, players switch.
     def switch_turn(self):
@@ -313,7 +331,10 @@ class Game():
         
         # En passant, promotion checks here
         try:
-            self.chess_module_board.push_uci(uci_string)
+            move = self.chess_module_board.parse_uci(uci_string)
+            # SAN (e.g. Nf3) has to be found before the move is made, for the PGN file
+            san = self.chess_module_board.san(move)
+            self.chess_module_board.push(move)
         except (chess.IllegalMoveError, ValueError) as e:
             print("The program couldn't detect your move. Please try running it again.")
             raise e
@@ -324,8 +345,15 @@ class Game():
         fen = self.chess_module_board.fen()
         self.move_to_fen_map[self.move_num] = fen
 
-        # Map move_num to eval - this is expensive, commenting out for now
-        self.move_to_eval_map[self.move_num] = self.get_eval(fen)
+        # Map move_num to eval - this is expensive, so it can be left to the post-game analysis instead
+        if self.live_evals:
+            self.move_to_eval_map[self.move_num] = self.get_eval(fen)
+
+        if (self.recorder is not None):
+            self.recorder.record_move(san, uci_string, fen, self.move_to_eval_map.get(self.move_num), self.image_processing.cell_scores)
+            # Once a move is on disk, only the latest FEN and eval need to stay in memory
+            self.move_to_fen_map.pop(self.move_num - 1, None)
+            self.move_to_eval_map.pop(self.move_num - 1, None)
 
         # Increment the move number
         self.move_num += 1
@@ -403,12 +431,44 @@ class Game():
 
 class Play():
 
-    def __init__(self, game = None):
-        self.game = Game()
-        self.cropper = cropper.Cropper()
-        self.final_points = self.cropper.run_cropper()
-        self.check_underpromotions()
+    # analysis_time_budget is the number of seconds Stockfish can spend analysing the whole game once it is transcribed.
+    # If video_path and clock_log_path are given, the board is read from the video at each clock press instead of from the pics folder.
+    # video_offset is how many seconds into the video the clock was started.
+    # recorder is a GameRecorder shared by every game in a batch, so the moves are written out as they are made.
+    # final_points and underpromotions can be passed in to skip asking for them, e.g. when the same crop is used for a batch of games.
+    def __init__(self, game = None, analysis_time_budget = None, video_path = None, clock_log_path = None, video_offset = 0.0, recorder = None,
+                 pics_directory = "pics", final_points = None, underpromotions = None, show_diff = True):
+        self.analysis_time_budget = analysis_time_budget
+        live_evals = self.analysis_time_budget is None
+        # Every game gets its own Board and ImageProcessing, so a game never starts from where the last one finished
+        if (video_path is not None):
+            self.game, first_image = self.setup_video(video_path, clock_log_path, video_offset, live_evals, show_diff)
+        else:
+            image_processing = image_processing_module.ImageProcessing(images_deque=deque(maxlen=2), file_names=[], directory=pics_directory, show_diff=show_diff)
+            self.game = Game(board=Board(), image_processing=image_processing, live_evals=live_evals)
+            first_image = None
+        self.game.recorder = recorder
+        if (final_points is not None):
+            self.final_points = final_points
+        elif (first_image is not None):
+            self.final_points = cropper.Cropper(image=first_image).run_cropper()
+        else:
+            self.final_points = cropper.Cropper(image_path=str(self.game.image_processing.file_names[0])).run_cropper()
+        if (underpromotions is not None):
+            self.game.underpromotions = underpromotions
+        else:
+            self.check_underpromotions()
     
+    # Seeks to the frame before each clock press, rather than decoding the whole video.
+    def setup_video(self, video_path, clock_log_path, video_offset, live_evals, show_diff):
+        clock_log = clock_module.ClockEventLog().load(clock_log_path)
+        timestamps = clock_log.frame_timestamps(video_offset)
+        frame_source = video_module.VideoFrameSource(video_path, timestamps)
+        image_processing = image_processing_module.ImageProcessing(images_deque=deque(maxlen=2), file_names=[], frame_source=frame_source, show_diff=show_diff)
+        # The cropper uses the starting position, read before the worker starts prefetching
+        first_frame = frame_source.read_frame(timestamps[0])
+        return Game(board=Board(), image_processing=image_processing, live_evals=live_evals), first_frame
+
     def check_underpromotions(self):
         underpromotions = input("Was any piece underpromoted in the game? Y/N: ")
         if (underpromotions.lower() == "y"):
@@ -418,12 +478,35 @@ class Play():
     
     def play_game(self):
         
+        recorder = self.game.recorder
+        if (recorder is not None):
+            recorder.start_game(self.game.chess_module_pgn.headers)
+
+        # If a move can't be detected, the game is still ended in the recorder (as "*"), so the next game starts cleanly
+        result = "*"
+        try:
+            self.play_moves()
+            result = self.game.chess_module_board.result()
+        finally:
+            if (recorder is not None):
+                recorder.end_game(result)
+            # Stops the worker seeking through the video, even if the game ended early
+            if (self.game.image_processing.frame_source is not None):
+                self.game.image_processing.frame_source.close()
+
+        if (self.analysis_time_budget is not None):
+            self.analyse_game()
+
+        print(self.game.chess_module_pgn)
+
+    def play_moves(self):
+
         self.game.make_move(has_castled = False, turn = "white", img_values=self.final_points)
         node = self.game.chess_module_pgn.add_variation(chess.Move.from_uci(self.game.current_uci))
         
         print(self.game.board)
         
-        for _ in range(1, len(self.game.image_processing.file_names)-1):
+        for _ in range(1, self.game.image_processing.count_images()-1):
 
             if (self.game.get_turn() == "white"):
                 if (not self.game.white_castled):
@@ -441,8 +524,40 @@ class Play():
                 
             print(self.game.board)
             node = node.add_variation(chess.Move.from_uci(self.game.current_uci))
-        
-        print(self.game.chess_module_pgn)
 
-play = Play()
-play.play_game()
+    # Analyses the finished game in one engine session, and writes the evals into the PGN as comments.
+    # The moves have already been written to the recorder by now, so the evals are added to its record file instead.
+    def analyse_game(self):
+        analysis = analysis_module.GameAnalysis(time_budget=self.analysis_time_budget)
+        self.game.move_to_eval_map = analysis.analyse_game(self.game.chess_module_pgn)
+        if (self.game.recorder is not None):
+            self.game.recorder.record_evals(self.game.move_to_eval_map)
+
+class Batch():
+
+    # Transcribes one game per folder of pictures, writing every game to the same recorder files.
+    # The crop is chosen once, on the first game, and reused for the rest, so the camera shouldn't move between games.
+    # Nothing is asked for each game, so any underpromotions will be recorded as queens.
+    def __init__(self, directories, record_path = "games", analysis_time_budget = None):
+        self.directories = directories
+        self.record_path = record_path
+        self.analysis_time_budget = analysis_time_budget
+
+    def play_games(self):
+
+        final_points = None
+        with game_record_module.GameRecorder(self.record_path) as recorder:
+            for directory in self.directories:
+                # Only one game is kept in memory at a time, the rest are on disk
+                play = Play(analysis_time_budget=self.analysis_time_budget, recorder=recorder, pics_directory=directory,
+                            final_points=final_points, underpromotions=False, show_diff=False)
+                final_points = play.final_points
+                try:
+                    play.play_game()
+                except (chess.IllegalMoveError, ValueError):
+                    # The game has already been ended in the recorder, so the batch carries on with the next one
+                    print(f"Skipping the game in {directory}.")
+
+if __name__ == "__main__":
+    play = Play()
+    play.play_game()
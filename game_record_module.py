@@ -0,0 +1,164 @@
+import chess.pgn
+import os
+import struct
+from pathlib import Path
+
+# This is the GameRecorder Class.
+# It writes each move to disk as soon as it is made, instead of keeping whole games in memory until the end.
+# Three files are kept next to each other, and are only ever appended to:
+#   <name>.pgn  - a PGN database with every game
+#   <name>.tsv  - tab separated records, each starting with its type:
+#                 move    ply, UCI, FEN, eval and the 64 cell brightness scores, written as each move is made
+#                 eval    ply and eval, written after a post-game analysis
+#                 result  the result of the game, written when it ends
+#   <name>.idx  - the byte offsets where each game starts in the other two files
+# The result isn't known when the PGN headers are written, so every game in the PGN ends with "*".
+# The record file is the one to trust for results, and for evals when the game was analysed after it was played.
+
+class GameRecorder:
+
+    # Each index entry is two unsigned 64-bit offsets (PGN, then move records), so game n is at byte n * 16.
+    index_entry = struct.Struct("<QQ")
+
+    def __init__(self, path="games"):
+
+        path = Path(path)
+        self.pgn_path = path.with_suffix(".pgn")
+        self.records_path = path.with_suffix(".tsv")
+        self.index_path = path.with_suffix(".idx")
+        # Binary append mode, so tell() gives the byte offsets for the index.
+        self.pgn_file = open(self.pgn_path, "ab")
+        self.records_file = open(self.records_path, "ab")
+        self.index_file = open(self.index_path, "ab")
+        # Only the current ply is kept between moves, so memory stays the same however many games are recorded.
+        self.ply = 0
+
+    # Flushes and syncs after every write, so a crash loses at most the move being written.
+    def write(self, file, data):
+
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    def format_header(self, key, value):
+
+        value = value.replace("\\", "\\\\").replace('"', '\\"')
+        return f'[{key} "{value}"]\n'
+
+    # The index entry is written first, so even a game that was cut off by a crash can be found.
+    def start_game(self, headers):
+
+        self.ply = 0
+        self.write(self.index_file, self.index_entry.pack(self.pgn_file.tell(), self.records_file.tell()))
+        header_text = "".join(self.format_header(key, value) for key, value in headers.items())
+        self.write(self.pgn_file, (header_text + "\n").encode("utf-8"))
+
+    # Formats an eval from the Stockfish API as a PGN comment, e.g. { [%eval 0.35] } or { [%eval #-3] }.
+    def format_eval(self, evaluation):
+
+        if evaluation is None:
+            return ""
+        if evaluation["type"] == "mate":
+            return f" {{ [%eval #{evaluation['value']}] }}"
+        return f" {{ [%eval {evaluation['value'] / 100:.2f}] }}"
+
+    def record_move(self, san, uci, fen, evaluation=None, cell_scores=()):
+
+        # White's moves start with the move number. Each full move goes on its own line.
+        if self.ply % 2 == 0:
+            movetext = f"{self.ply // 2 + 1}. {san}{self.format_eval(evaluation)} "
+        else:
+            movetext = f"{san}{self.format_eval(evaluation)}\n"
+
+        cells_text = ",".join(str(score) for score in cell_scores)
+
+        self.write(self.pgn_file, movetext.encode("utf-8"))
+        self.write_record("move", str(self.ply + 1), uci, fen, self.format_eval_record(evaluation), cells_text)
+        self.ply += 1
+
+    def write_record(self, *fields):
+        self.write(self.records_file, ("\t".join(fields) + "\n").encode("utf-8"))
+
+    # Evals are stored as "<type>:<value>", e.g. "cp:35" or "mate:-3", or left empty if there is no eval.
+    def format_eval_record(self, evaluation):
+
+        if evaluation is None:
+            return ""
+        return f"{evaluation['type']}:{evaluation['value']}"
+
+    # Writes the evals from a post-game analysis, as a move_num to eval map. These replace any evals written with the moves.
+    def record_evals(self, move_to_eval_map):
+
+        for move_num, evaluation in sorted(move_to_eval_map.items()):
+            self.write_record("eval", str(move_num), self.format_eval_record(evaluation))
+
+    # The PGN always ends with "*" to match its Result header. The real result goes in the record file.
+    def end_game(self, result="*"):
+        self.write_record("result", result)
+        self.write(self.pgn_file, "*\n\n".encode("utf-8"))
+
+    def close(self):
+        self.pgn_file.close()
+        self.records_file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def count_games(self):
+        return os.path.getsize(self.index_path) // self.index_entry.size
+
+    # Reads one index entry straight from the index file, without loading the rest of it.
+    def read_index_entry(self, game_num):
+
+        with open(self.index_path, "rb") as index_file:
+            index_file.seek(game_num * self.index_entry.size)
+            data = index_file.read(self.index_entry.size)
+        if len(data) < self.index_entry.size:
+            raise IndexError(f"Error: There is no game {game_num} in {self.index_path}")
+        return self.index_entry.unpack(data)
+
+    # Reads any game back from the PGN database by its number (0-indexed).
+    def read_game(self, game_num):
+
+        pgn_offset, _ = self.read_index_entry(game_num)
+        with open(self.pgn_path, encoding="utf-8") as pgn_file:
+            pgn_file.seek(pgn_offset)
+            return chess.pgn.read_game(pgn_file)
+
+    # Reads the records of a game, as lists of the tab separated fields (starting with the record type).
+    def read_records(self, game_num):
+
+        _, records_offset = self.read_index_entry(game_num)
+        # The records of a game end where the next game's start, or at the end of the file.
+        if game_num + 1 < self.count_games():
+            records_end = self.read_index_entry(game_num + 1)[1]
+        else:
+            records_end = os.path.getsize(self.records_path)
+
+        with open(self.records_path, "rb") as records_file:
+            records_file.seek(records_offset)
+            data = records_file.read(records_end - records_offset).decode("utf-8")
+        return [line.split("\t") for line in data.splitlines()]
+
+    # The evals of a game, as a ply to eval string map. Evals from a post-game analysis replace the ones written with the moves.
+    def read_evals(self, game_num):
+
+        evals = {}
+        for record in self.read_records(game_num):
+            if record[0] == "move" and record[4]:
+                evals[int(record[1])] = record[4]
+            elif record[0] == "eval":
+                evals[int(record[1])] = record[2]
+        return evals
+
+    # The result of a game, or "*" if it was cut off before it ended.
+    def read_result(self, game_num):
+
+        for record in self.read_records(game_num):
+            if record[0] == "result":
+                return record[1]
+        return "*"
@@ -9,7 +9,7 @@ from pathlib import Path
 
 class ImageProcessing:
     
-    def __init__(self, images_deque=deque(maxlen=2), file_names = list()):
+    def __init__(self, images_deque=deque(maxlen=2), file_names = list(), frame_source = None, directory = "pics", show_diff = True):
         
         # I used a deque to store the image. 
         # Since I need to compare consecutive images, it made sense to pop from the left once I'm done with an image, and append to the right and keep repeating this.
@@ -18,6 +18,14 @@ class ImageProcessing:
         self.file_names = file_names
         # This picture_number will be used for indexing with the file_names list
         self.picture_number = 0
+        # If the game was filmed, the frames come from a video (one per clock press) instead of the file_names list
+        self.frame_source = frame_source
+        # The folder the pictures of the board are read from
+        self.directory = directory
+        # Showing the difference image waits for a key press, so it is turned off when games are processed in a batch
+        self.show_diff = show_diff
+        # The brightness of each of the 64 cells for the last move, row by row. These are saved with each move when games are recorded.
+        self.cell_scores = []
         # Like the Board class, I needed a grid_tile map for handling castling. I will refactor this code and pass in the Board state to the program, however.
         self.grid_tile_map = {}
         self.populate_gt_map()
@@ -59,9 +67,10 @@ class ImageProcessing:
     def find_max_brightness_values(self, abs_diff, has_castled, turn, board_array):
         
         # for debugging
-        cv2.imshow("abs_diff", abs_diff)
-        cv2.waitKey(0)
-        cv2.destroyAllWindows()
+        if self.show_diff:
+            cv2.imshow("abs_diff", abs_diff)
+            cv2.waitKey(0)
+            cv2.destroyAllWindows()
         
         # The image is going to be divided into an 8 x 8 board.
         grid_size = 8
@@ -85,6 +94,8 @@ class ImageProcessing:
                 # Adds it to the list as a tuple, also noting the row and the column (0-indexed, like my grid)
                 brightness_list.append((cell_brightness, (row, col)))
 
+        self.cell_scores = [int(cell_brightness) for cell_brightness, _ in brightness_list]
+
         # Sorts the list from largest to smallest brightness values
         sorted_brightness_list = sorted(brightness_list, reverse=True)
         
@@ -147,13 +158,10 @@ class ImageProcessing:
     def detect_first_move(self, board_array, values):
         
         # reads the initial image
-        image_initial = cv2.imread(self.file_names[self.picture_number])
-    
-        self.picture_number += 1
+        image_initial = self.read_image()
 
         # reads the next image
-        image_next = cv2.imread(self.file_names[self.picture_number])
-        self.picture_number += 1    
+        image_next = self.read_image()
 
         cropped_initial = self.crop_image(image_initial, values)
         cropped_next = self.crop_image(image_next, values)
@@ -172,8 +180,7 @@ class ImageProcessing:
 
         prev_image = self.images_deque.popleft()
 
-        curr_image = cv2.imread(self.file_names[self.picture_number])
-        self.picture_number += 1
+        curr_image = self.read_image()
 
         cropped_curr = self.crop_image(curr_image, values)
         blurred_curr = self.pre_process_image(cropped_curr)
@@ -185,12 +192,28 @@ class ImageProcessing:
         first_max_position, second_max_position = self.find_max_brightness_values(abs_diff, has_castled, turn, board_array)
         return first_max_position, second_max_position
     
+    # Reads the next picture of the board, either from the pics folder or from the video.
+    def read_image(self):
+
+        if self.frame_source is not None:
+            image = self.frame_source.next_frame()
+        else:
+            image = cv2.imread(self.file_names[self.picture_number])
+        self.picture_number += 1
+        return image
+
+    # The number of pictures of the board, which is one more than the number of moves.
+    def count_images(self):
+
+        if self.frame_source is not None:
+            return len(self.frame_source)
+        return len(self.file_names)
+
     def read_file_names(self):
-        # Put the images of the chessboard in "pics"
-        directory = "pics"
+        # Put the images of the chessboard in "pics" (or the directory given)
         # This assumes the images can be sorted by their name, which indicates when they were created.
-        files = sorted(os.listdir(directory))
-        directory = Path("pics")
+        files = sorted(os.listdir(self.directory))
+        directory = Path(self.directory)
 
         for file in files:
             # ".DS_Store" file is created, and I don't want to read that in my image processing.
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules live at the top of the repo, so it is added to the path for the tests.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,32 @@
+import sys
+
+# A tiny UCI engine for the analysis tests. It logs every command it gets to the file given as its argument,
+# and reports the eval (from white's point of view) in SCORES for the number of moves played.
+SCORES = [20, 30, -500, -480, -470, -490]
+
+log_path = sys.argv[1]
+moves_played = 0
+
+with open(log_path, "a") as log:
+    for line in sys.stdin:
+        command = line.strip()
+        log.write(command + "\n")
+        log.flush()
+        if command == "uci":
+            print("id name FakeEngine")
+            print("option name Hash type spin default 16 min 1 max 4096")
+            print("option name Threads type spin default 1 min 1 max 64")
+            print("uciok", flush=True)
+        elif command == "isready":
+            print("readyok", flush=True)
+        elif command.startswith("position"):
+            moves_played = len(command.split(" moves ")[1].split()) if " moves " in command else 0
+        elif command.startswith("go"):
+            score = SCORES[moves_played - 1]
+            # UCI scores are from the point of view of the side to move
+            if moves_played % 2 == 1:
+                score = -score
+            print(f"info depth 12 score cp {score}")
+            print("bestmove 0000", flush=True)
+        elif command == "quit":
+            break
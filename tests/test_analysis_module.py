@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+import chess.engine
+import chess.pgn
+import pytest
+
+import analysis_module
+
+
+def test_find_swings():
+    analysis = analysis_module.GameAnalysis()
+    assert analysis.find_swings([20, 30, -500, 9990]) == [20, 10, 530, 10490]
+
+
+def test_allocate_time_sums_to_budget():
+    analysis = analysis_module.GameAnalysis()
+    limits = analysis.allocate_time([20, 10, 530, 10490], 10.0)
+    assert sum(limits) == pytest.approx(10.0)
+
+
+def test_allocate_time_caps_swings():
+    analysis = analysis_module.GameAnalysis(max_swing=300)
+    limits = analysis.allocate_time([0, 0, 530, 10490], 10.0)
+    # Both big swings are capped, so they get the same time, and the quiet positions still get a quarter of it.
+    assert limits[2] == pytest.approx(limits[3])
+    assert limits[0] == pytest.approx(limits[3] / 4)
+
+
+def test_allocate_time_even_without_swings():
+    analysis = analysis_module.GameAnalysis()
+    assert analysis.allocate_time([0, 0, 0, 0], 8.0) == pytest.approx([2.0, 2.0, 2.0, 2.0])
+
+
+@pytest.mark.parametrize("scan_share", [-0.1, 1.5])
+def test_rejects_bad_scan_share(scan_share):
+    with pytest.raises(ValueError):
+        analysis_module.GameAnalysis(scan_share=scan_share)
+
+
+def test_to_eval_dict_centipawns():
+    analysis = analysis_module.GameAnalysis()
+    score = chess.engine.PovScore(chess.engine.Cp(35), chess.BLACK)
+    # Evals are always from white's point of view, like the Stockfish API.
+    assert analysis.to_eval_dict(score) == {"type": "cp", "value": -35}
+
+
+def test_to_eval_dict_mate():
+    analysis = analysis_module.GameAnalysis()
+    score = chess.engine.PovScore(chess.engine.Mate(3), chess.WHITE)
+    assert analysis.to_eval_dict(score) == {"type": "mate", "value": 3}
+    score = chess.engine.PovScore(chess.engine.Mate(2), chess.BLACK)
+    assert analysis.to_eval_dict(score) == {"type": "mate", "value": -2}
+
+
+MOVES = ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5", "a7a6"]
+SCORES = [20, 30, -500, -480, -470, -490]
+FAKE_ENGINE = Path(__file__).resolve().parent / "fixtures" / "fake_engine.py"
+
+
+def make_game(moves):
+    game = chess.pgn.Game()
+    node = game
+    for uci in moves:
+        node = node.add_variation(chess.Move.from_uci(uci))
+    return game
+
+
+@pytest.fixture
+def engine_log(tmp_path):
+    return tmp_path / "engine.log"
+
+
+def analyse(engine_log, time_budget=6.0):
+    analysis = analysis_module.GameAnalysis(engine_path=[sys.executable, str(FAKE_ENGINE), str(engine_log)], time_budget=time_budget)
+    game = make_game(MOVES)
+    return game, analysis.analyse_game(game), engine_log.read_text().splitlines()
+
+
+def test_analyse_game_uses_one_session(engine_log):
+    _, _, commands = analyse(engine_log)
+    # The engine is only told about a new game once, so its hash table is kept between positions
+    assert commands.count("ucinewgame") == 1
+    assert "setoption name Hash value 256" in commands
+    # Both passes feed the moves in order, one more move each time
+    positions = [command for command in commands if command.startswith("position")]
+    expected = [f"position startpos moves {' '.join(MOVES[:ply])}" for ply in range(1, len(MOVES) + 1)]
+    assert positions == expected * 2
+
+
+def test_analyse_game_stays_within_budget(engine_log):
+    _, _, commands = analyse(engine_log, time_budget=6.0)
+    movetimes = [int(command.split("movetime ")[1].split()[0]) for command in commands if command.startswith("go")]
+    assert len(movetimes) == 2 * len(MOVES)
+    # Each movetime is rounded to a millisecond
+    assert sum(movetimes) == pytest.approx(6000, abs=len(movetimes))
+    scan_times, deep_times = movetimes[:len(MOVES)], movetimes[len(MOVES):]
+    assert sum(scan_times) == pytest.approx(1500, abs=len(MOVES))
+    # The position after the big swing (move 3) gets the most time in the deep pass
+    assert max(deep_times) == deep_times[2]
+    assert deep_times[2] > deep_times[1]
+
+
+def test_analyse_game_writes_evals(engine_log):
+    game, move_to_eval_map, _ = analyse(engine_log)
+    assert move_to_eval_map == {move_num: {"type": "cp", "value": score} for move_num, score in enumerate(SCORES, start=1)}
+    evals = [node.eval() for node in game.mainline()]
+    assert [score.white() for score in evals] == [chess.engine.Cp(score) for score in SCORES]
+    assert [node.eval_depth() for node in game.mainline()] == [12] * len(MOVES)
+    assert "[%eval -5.00,12]" in str(game)
+
+
+def test_analyse_empty_game(engine_log):
+    analysis = analysis_module.GameAnalysis(engine_path=[sys.executable, str(FAKE_ENGINE), str(engine_log)])
+    assert analysis.analyse_game(chess.pgn.Game()) == {}
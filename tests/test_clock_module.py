@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+import clock_module
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "clock_events" / "sample.txt"
+
+
+def write_events(tmp_path, text):
+    path = tmp_path / "events.txt"
+    path.write_text(text)
+    return path
+
+
+def test_load_sample():
+    clock_log = clock_module.ClockEventLog().load(SAMPLE_PATH)
+    # Comments and blank lines in the sample are skipped.
+    assert clock_log.events == [(0.0, "start"), (4.12, "white"), (9.87, "black"), (15.3, "white"), (21.05, "black")]
+    assert clock_log.frame_timestamps() == [0.0, 4.12, 9.87, 15.3, 21.05]
+
+
+def test_frame_timestamps_with_offset():
+    clock_log = clock_module.ClockEventLog().load(SAMPLE_PATH)
+    assert clock_log.frame_timestamps(video_offset=2.5) == pytest.approx([2.5, 6.62, 12.37, 17.8, 23.55])
+
+
+def test_save_and_load(tmp_path):
+    clock_log = clock_module.ClockEventLog().load(SAMPLE_PATH)
+    path = tmp_path / "saved.txt"
+    clock_log.save(path)
+    assert clock_module.ClockEventLog().load(path).events == clock_log.events
+
+
+@pytest.mark.parametrize("text", [
+    "0.0 start\n4.0\n",
+    "0.0 start\nfour white\n",
+    "0.0 start\n4.0 white extra\n",
+    "0.0 start\n4.0 pause\n",
+])
+def test_load_rejects_bad_lines(tmp_path, text):
+    with pytest.raises(ValueError, match="line 2|Unknown"):
+        clock_module.ClockEventLog().load(write_events(tmp_path, text))
+
+
+@pytest.mark.parametrize("text", [
+    # The same player pressed twice in a row
+    "0.0 start\n4.0 white\n6.0 white\n",
+    # Black can't press first
+    "0.0 start\n4.0 black\n",
+    # A press before the clock was started
+    "4.0 white\n",
+    # Started twice
+    "0.0 start\n1.0 start\n",
+    # Going back in time
+    "0.0 start\n4.0 white\n3.0 black\n",
+])
+def test_load_rejects_bad_sequences(tmp_path, text):
+    with pytest.raises(ValueError):
+        clock_module.ClockEventLog().load(write_events(tmp_path, text))
+
+
+def test_load_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        clock_module.ClockEventLog().load(tmp_path / "missing.txt")
+
+
+def test_frame_timestamps_needs_start():
+    with pytest.raises(ValueError):
+        clock_module.ClockEventLog().frame_timestamps()
+
+
+def test_frame_timestamps_needs_a_press(tmp_path):
+    clock_log = clock_module.ClockEventLog().load(write_events(tmp_path, "0.0 start\n"))
+    with pytest.raises(ValueError, match="at least one press"):
+        clock_log.frame_timestamps()
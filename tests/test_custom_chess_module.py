@@ -0,0 +1,141 @@
+import functools
+import sys
+from pathlib import Path
+
+import chess
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import analysis_module
+import cropper
+import custom_chess_module
+import game_record_module
+import image_processing_module
+
+FAKE_ENGINE = Path(__file__).resolve().parent / "fixtures" / "fake_engine.py"
+
+# Moves as the (row, column) grid squares ImageProcessing would find, with row 0 as the 8th rank.
+E4_E5_NF3 = [((6, 4), (4, 4)), ((1, 4), (3, 4)), ((7, 6), (5, 5))]
+FOOLS_MATE = [((6, 5), (5, 5)), ((1, 4), (3, 4)), ((6, 6), (4, 6)), ((0, 3), (4, 7))]
+# Black's rook from a8 to a3 isn't a legal move, like a move the images were wrong about
+UNDETECTED = E4_E5_NF3 + [((0, 0), (5, 0))]
+
+CELL_SCORES = list(range(64))
+
+
+class FakeStockfish:
+
+    def set_fen_position(self, fen):
+        self.fen = fen
+
+    def get_evaluation(self):
+        return {"type": "cp", "value": len(self.fen)}
+
+
+# Replaces the image steps: the moves come from a script for each folder, instead of from the pictures.
+@pytest.fixture
+def scripted_moves(monkeypatch):
+    scripts = {}
+
+    def next_move(image_processing):
+        move_index = getattr(image_processing, "move_index", 0)
+        image_processing.move_index = move_index + 1
+        image_processing.cell_scores = CELL_SCORES
+        return scripts[str(image_processing.directory)][move_index]
+
+    monkeypatch.setattr(image_processing_module.ImageProcessing, "detect_first_move", lambda self, board_array, values: next_move(self))
+    monkeypatch.setattr(image_processing_module.ImageProcessing, "detect_move", lambda self, has_castled, turn, board_array, values: next_move(self))
+    monkeypatch.setattr(cropper.Cropper, "run_cropper", lambda self: [0, 8, 0, 8])
+    monkeypatch.setattr(custom_chess_module, "Stockfish", FakeStockfish)
+    return scripts
+
+
+# Makes a folder with one (blank) picture per position, and the moves that will be "detected" in it.
+def make_pics(tmp_path, scripts, name, moves):
+    directory = tmp_path / name
+    directory.mkdir()
+    for picture_number in range(len(moves) + 1):
+        cv2.imwrite(str(directory / f"IMG_{picture_number:04}.jpg"), np.zeros((8, 8, 3), np.uint8))
+    scripts[str(directory)] = moves
+    return str(directory)
+
+
+def make_play(directory, recorder, **kwargs):
+    return custom_chess_module.Play(recorder=recorder, pics_directory=directory, final_points=[0, 8, 0, 8], underpromotions=False, show_diff=False, **kwargs)
+
+
+def test_records_each_move(tmp_path, scripted_moves):
+    directory = make_pics(tmp_path, scripted_moves, "game", E4_E5_NF3)
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        play = make_play(directory, recorder)
+        play.play_game()
+
+        game = recorder.read_game(0)
+        assert [move.uci() for move in game.mainline_moves()] == ["e2e4", "e7e5", "g1f3"]
+        assert "1. e4" in (tmp_path / "games.pgn").read_text()
+        move_records = [record for record in recorder.read_records(0) if record[0] == "move"]
+        assert [record[2] for record in move_records] == ["e2e4", "e7e5", "g1f3"]
+        assert move_records[2][3] == play.game.chess_module_board.fen()
+        assert move_records[2][4] == f"cp:{len(play.game.chess_module_board.fen())}"
+        assert move_records[2][5] == ",".join(str(score) for score in CELL_SCORES)
+        assert recorder.read_result(0) == "*"
+
+    # Only the latest move is kept in memory once the rest are on disk
+    assert list(play.game.move_to_fen_map) == [3]
+    assert list(play.game.move_to_eval_map) == [3]
+
+
+def test_undetected_move_still_ends_game(tmp_path, scripted_moves):
+    failing_directory = make_pics(tmp_path, scripted_moves, "failing", UNDETECTED)
+    next_directory = make_pics(tmp_path, scripted_moves, "next", FOOLS_MATE)
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        with pytest.raises(chess.IllegalMoveError):
+            make_play(failing_directory, recorder).play_game()
+        assert recorder.read_result(0) == "*"
+        assert (tmp_path / "games.pgn").read_text().rstrip().endswith("*")
+
+        # The next game starts from the starting position, and is recorded on its own
+        make_play(next_directory, recorder).play_game()
+        assert recorder.count_games() == 2
+        assert [move.uci() for move in recorder.read_game(0).mainline_moves()] == ["e2e4", "e7e5", "g1f3"]
+        assert [move.uci() for move in recorder.read_game(1).mainline_moves()] == ["f2f3", "e7e5", "g2g4", "d8h4"]
+        assert recorder.read_result(1) == "0-1"
+
+
+def test_analysis_evals_are_recorded(tmp_path, scripted_moves, monkeypatch):
+    engine_path = [sys.executable, str(FAKE_ENGINE), str(tmp_path / "engine.log")]
+    monkeypatch.setattr(analysis_module, "GameAnalysis", functools.partial(analysis_module.GameAnalysis, engine_path=engine_path))
+    # Stockfish isn't needed when the game is analysed afterwards
+    monkeypatch.setattr(custom_chess_module, "Stockfish", None)
+    directory = make_pics(tmp_path, scripted_moves, "game", E4_E5_NF3)
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        play = make_play(directory, recorder, analysis_time_budget=0.3)
+        play.play_game()
+        assert play.game.stockfish is None
+        # The moves were written without evals, and the analysis evals were added afterwards
+        assert all(record[4] == "" for record in recorder.read_records(0) if record[0] == "move")
+        assert recorder.read_evals(0) == {1: "cp:20", 2: "cp:30", 3: "cp:-500"}
+
+
+def test_live_evals_need_stockfish(tmp_path, scripted_moves, monkeypatch):
+    monkeypatch.setattr(custom_chess_module, "Stockfish", None)
+    directory = make_pics(tmp_path, scripted_moves, "game", E4_E5_NF3)
+    with pytest.raises(ImportError):
+        make_play(directory, None)
+
+
+def test_batch(tmp_path, scripted_moves):
+    directories = [
+        make_pics(tmp_path, scripted_moves, "game_1", UNDETECTED),
+        make_pics(tmp_path, scripted_moves, "game_2", FOOLS_MATE),
+    ]
+    custom_chess_module.Batch(directories, record_path=tmp_path / "games").play_games()
+
+    recorder = game_record_module.GameRecorder(tmp_path / "games")
+    # The game with the undetected move is skipped, and the batch carries on with the next one
+    assert recorder.count_games() == 2
+    assert [recorder.read_result(game_num) for game_num in range(2)] == ["*", "0-1"]
+    assert [move.uci() for move in recorder.read_game(1).mainline_moves()] == ["f2f3", "e7e5", "g2g4", "d8h4"]
+    recorder.close()
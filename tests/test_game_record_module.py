@@ -0,0 +1,85 @@
+import chess
+import chess.engine
+import chess.pgn
+import pytest
+
+import game_record_module
+
+FOOLS_MATE = ["f2f3", "e7e5", "g2g4", "d8h4"]
+
+
+# Plays the moves on a board and records each one straight to the recorder.
+# How Game and Play use the recorder is tested in test_custom_chess_module.py.
+def record_game(recorder, moves, evals=None):
+    recorder.start_game(chess.pgn.Game().headers)
+    board = chess.Board()
+    for ply, uci in enumerate(moves):
+        move = board.parse_uci(uci)
+        san = board.san(move)
+        board.push(move)
+        evaluation = evals[ply] if evals else None
+        recorder.record_move(san, uci, board.fen(), evaluation, range(64))
+    return board
+
+
+def test_records_games(tmp_path):
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        board = record_game(recorder, ["e2e4", "e7e5", "g1f3"], [{"type": "cp", "value": 30}, {"type": "cp", "value": -20}, {"type": "mate", "value": 3}])
+        recorder.end_game(board.result())
+        board = record_game(recorder, FOOLS_MATE)
+        recorder.end_game(board.result())
+
+    # A new recorder on the same files can read every game back by its number
+    recorder = game_record_module.GameRecorder(tmp_path / "games")
+    assert recorder.count_games() == 2
+
+    game = recorder.read_game(0)
+    assert [move.uci() for move in game.mainline_moves()] == ["e2e4", "e7e5", "g1f3"]
+    assert game.next().eval().white() == chess.engine.Cp(30)
+    assert game.end().eval().white() == chess.engine.Mate(3)
+    assert [move.uci() for move in recorder.read_game(1).mainline_moves()] == FOOLS_MATE
+
+    records = recorder.read_records(1)
+    assert [record[:3] for record in records[:4]] == [["move", str(ply), uci] for ply, uci in enumerate(FOOLS_MATE, start=1)]
+    assert records[3][5] == ",".join(str(score) for score in range(64))
+    assert recorder.read_evals(0) == {1: "cp:30", 2: "cp:-20", 3: "mate:3"}
+    recorder.close()
+
+
+def test_result_is_in_record_file(tmp_path):
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        board = record_game(recorder, FOOLS_MATE)
+        recorder.end_game(board.result())
+        assert recorder.read_result(0) == "0-1"
+        # The PGN always ends with "*", so it agrees with its Result header
+        game = recorder.read_game(0)
+        assert game.headers["Result"] == "*"
+        assert (tmp_path / "games.pgn").read_text().rstrip().endswith("*")
+
+
+def test_analysis_evals_replace_move_evals(tmp_path):
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        record_game(recorder, ["e2e4", "e7e5"], [{"type": "cp", "value": 30}, None])
+        recorder.end_game()
+        recorder.record_evals({2: {"type": "cp", "value": -15}, 1: {"type": "cp", "value": 25}})
+        assert recorder.read_evals(0) == {1: "cp:25", 2: "cp:-15"}
+
+
+def test_unfinished_game(tmp_path):
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        record_game(recorder, ["e2e4"])
+        # A crash here leaves the game without an end, but it can still be read
+        assert recorder.read_result(0) == "*"
+        assert [move.uci() for move in recorder.read_game(0).mainline_moves()] == ["e2e4"]
+
+
+def test_missing_game(tmp_path):
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        with pytest.raises(IndexError):
+            recorder.read_game(0)
+
+
+def test_closed_after_with(tmp_path):
+    with game_record_module.GameRecorder(tmp_path / "games") as recorder:
+        pass
+    assert recorder.pgn_file.closed and recorder.records_file.closed and recorder.index_file.closed
@@ -0,0 +1,90 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import video_module
+
+FPS = 10
+
+
+# Writes a short lossless video where every pixel of frame i has the value i, so the frame index can be read back.
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / "game.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"FFV1"), FPS, (32, 32))
+    if not writer.isOpened():
+        pytest.skip("OpenCV can't write FFV1 video here")
+    for frame_index in range(100):
+        writer.write(np.full((32, 32, 3), frame_index, np.uint8))
+    writer.release()
+    return path
+
+
+def frame_number(frame):
+    return int(frame[0, 0, 0])
+
+
+def test_read_frame_before_press(video_path):
+    frame_source = video_module.VideoFrameSource(video_path, [])
+    assert frame_number(frame_source.read_frame(3.05)) == int(3.05 * FPS) - 1
+    assert frame_number(frame_source.read_frame(0.0)) == 0
+
+
+def test_next_frame_in_order(video_path):
+    timestamps = [0.0, 1.2, 4.5, 2.0, 9.9]
+    # A small queue means the worker has to wait for frames to be taken.
+    frame_source = video_module.VideoFrameSource(video_path, timestamps, prefetch_size=2)
+    assert len(frame_source) == 5
+    assert [frame_number(frame_source.next_frame()) for _ in timestamps] == [0, 11, 44, 19, 98]
+
+
+def test_next_frame_past_end(video_path):
+    frame_source = video_module.VideoFrameSource(video_path, [1.0, 100.0])
+    assert frame_number(frame_source.next_frame()) == 9
+    with pytest.raises(ValueError):
+        frame_source.next_frame()
+
+
+def test_missing_video(tmp_path):
+    frame_source = video_module.VideoFrameSource(tmp_path / "missing.avi", [0.0])
+    with pytest.raises(FileNotFoundError):
+        frame_source.next_frame()
+
+
+class NoFrameRateCapture:
+
+    def get(self, prop):
+        return 0.0
+
+
+def test_seek_frame_without_frame_rate():
+    frame_source = video_module.VideoFrameSource("webcam.avi", [1.0])
+    with pytest.raises(ValueError, match="frame rate"):
+        frame_source.seek_frame(NoFrameRateCapture(), 1.0)
+
+
+def test_next_frame_after_last_timestamp(video_path):
+    timestamps = [0.0, 1.0]
+    frame_source = video_module.VideoFrameSource(video_path, timestamps)
+    for _ in timestamps:
+        frame_source.next_frame()
+    # One more frame than there are timestamps is an error, not a wait that never ends
+    with pytest.raises(IndexError):
+        frame_source.next_frame()
+    with pytest.raises(IndexError):
+        frame_source.next_frame()
+
+
+def test_close_stops_worker(video_path):
+    # The queue only holds one frame, so the worker is left waiting to put the next one
+    frame_source = video_module.VideoFrameSource(video_path, [0.0, 1.0, 2.0, 3.0, 4.0], prefetch_size=1)
+    frame_source.next_frame()
+    frame_source.close()
+    assert not frame_source.worker.is_alive()
+
+
+def test_close_before_start(video_path):
+    with video_module.VideoFrameSource(video_path, [0.0]) as frame_source:
+        pass
+    assert frame_source.worker is None
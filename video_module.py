@@ -0,0 +1,117 @@
+import cv2
+import queue
+import threading
+
+# This is the VideoFrameSource Class.
+# Instead of decoding the whole video, it seeks straight to the frame just before each clock press.
+# A worker thread does the seeking ahead of time, so the frames are ready by the time ImageProcessing asks for them.
+
+class VideoFrameSource:
+
+    def __init__(self, video_path, timestamps, prefetch_size=8):
+
+        self.video_path = str(video_path)
+        # One timestamp (in seconds) per frame that is needed - the start of the game, then every press.
+        self.timestamps = timestamps
+        # The queue is bounded, so only a few frames are held in memory no matter how long the video is.
+        self.frames = queue.Queue(maxsize=prefetch_size)
+        self.worker = None
+        # Set by close(), so the worker stops even if no more frames are taken from the queue.
+        self.stopped = threading.Event()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def open_capture(self):
+
+        capture = cv2.VideoCapture(self.video_path)
+        if not capture.isOpened():
+            raise FileNotFoundError(f"Error: Could not load video at {self.video_path}")
+        return capture
+
+    # The frame just before the press is used, since the player's hand is usually over the clock (not the board) at the press itself.
+    def seek_frame(self, capture, timestamp):
+
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        # Some containers and webcams don't report a frame rate. Every timestamp would then map to frame 0, so this is an error.
+        if fps <= 0:
+            raise ValueError(f"Error: Could not read the frame rate of {self.video_path}")
+        frame_index = max(int(timestamp * fps) - 1, 0)
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        read_ok, frame = capture.read()
+        if not read_ok:
+            raise ValueError(f"Error: Could not read a frame at {timestamp}s from {self.video_path}")
+        return frame
+
+    # Reads a single frame without the worker, e.g. for the cropper before the game is processed.
+    def read_frame(self, timestamp):
+
+        capture = self.open_capture()
+        try:
+            return self.seek_frame(capture, timestamp)
+        finally:
+            capture.release()
+
+    # Waits while the queue is full, but gives up if the source is closed. Returns False if it was.
+    def put_frame(self, frame):
+
+        while not self.stopped.is_set():
+            try:
+                self.frames.put(frame, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # This runs on the worker thread. Frames are put on the queue in order, and it waits while the queue is full.
+    def prefetch_frames(self):
+
+        try:
+            capture = self.open_capture()
+            try:
+                for timestamp in self.timestamps:
+                    if not self.put_frame(self.seek_frame(capture, timestamp)):
+                        return
+            finally:
+                capture.release()
+        except Exception as e:
+            # The error is passed on to the main thread, so it is raised where the frame was needed.
+            self.put_frame(e)
+            return
+        # Asking for more frames than there are timestamps raises this, instead of waiting forever.
+        self.put_frame(IndexError(f"Error: No frames left in {self.video_path} after {len(self.timestamps)} clock events"))
+
+    def start(self):
+
+        self.worker = threading.Thread(target=self.prefetch_frames, daemon=True)
+        self.worker.start()
+
+    def next_frame(self):
+
+        if self.worker is None:
+            self.start()
+        frame = self.frames.get()
+        if isinstance(frame, Exception):
+            # The worker has finished, so the error is put back for any later calls.
+            self.frames.put(frame)
+            raise frame
+        return frame
+
+    # Stops the worker (which releases the video), e.g. when a game ends early because a move couldn't be detected.
+    def close(self):
+
+        self.stopped.set()
+        # Empties the queue, so a worker waiting to put a frame can see that it has been stopped.
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+        if self.worker is not None:
+            self.worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()